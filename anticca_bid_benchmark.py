@@ -0,0 +1,300 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║          ANTICCA — Teklif Eşzamanlılık Benchmark'ı               ║
+║                                                                  ║
+║  Hedef veritabanında geçici bir müzayede oluşturur, üzerine      ║
+║  binlerce eşzamanlı teklif gönderir ve şunları raporlar:         ║
+║    • Kabul edilen teklif / saniye                                ║
+║    • p50 / p99 gecikme                                           ║
+║    • Tutarlılık ihlalleri:                                       ║
+║        current_bid = en yüksek kabul = en yüksek bid kaydı       ║
+║        bid_count   = bid kaydı sayısı                            ║
+║        daha yüksek bir teklifin üzerine düşük teklif yazılmaz    ║
+║  Bitince müzayede ve teklif kayıtları silinir (--keep hariç).    ║
+║                                                                  ║
+║  Kullanım (backend kökünde, app/ yanında):                       ║
+║    python anticca_bid_benchmark.py --bids 5000 --concurrency 500 ║
+║                                                                  ║
+║  Eski oku → doğrula → yaz akışıyla karşılaştırma:                ║
+║    python anticca_bid_benchmark.py --mode legacy                 ║
+║                                                                  ║
+║  Anti-snipe yolunu da çalıştırmak için (bitişe 4 dk):            ║
+║    python anticca_bid_benchmark.py --snipe                       ║
+╚══════════════════════════════════════════════════════════════════╝
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+from collections import Counter
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta, timezone
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import ConnectionFailure
+
+# Backend kökünden (app/ klasörünün yanında) çalıştırılmalı
+from app.services import bidding
+
+DEFAULT_DB_NAME = "anticca"
+STARTING_BID = 1000.0
+MIN_INCREMENT = 10.0
+
+
+# ══════════════════════════════════════════════════════════════════
+# AYARLAR
+# ══════════════════════════════════════════════════════════════════
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="ANTICCA teklif eşzamanlılık benchmark'ı",
+    )
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL"),
+                        help="MongoDB bağlantı URL'i (env: MONGO_URL)")
+    parser.add_argument("--db-name", default=os.environ.get("DB_NAME", DEFAULT_DB_NAME),
+                        help=f"Veritabanı adı (env: DB_NAME, varsayılan: {DEFAULT_DB_NAME})")
+    parser.add_argument("--bids", type=int, default=5000,
+                        help="Gönderilecek toplam teklif (varsayılan: 5000)")
+    parser.add_argument("--bidders", type=int, default=200,
+                        help="Farklı teklif veren sayısı (varsayılan: 200)")
+    parser.add_argument("--concurrency", type=int, default=500,
+                        help="Aynı anda uçuşta olan en fazla teklif (varsayılan: 500)")
+    parser.add_argument("--mode", choices=["atomic", "legacy"], default="atomic",
+                        help="atomic: app.services.bidding; legacy: eski oku → doğrula → yaz akışı")
+    parser.add_argument("--snipe", action="store_true",
+                        help="Müzayede 4 dk içinde bitsin; her teklif anti-snipe uzatmasını tetikler")
+    parser.add_argument("--seed", type=int, default=42,
+                        help="Teklif tutarları için rastgele tohum (varsayılan: 42)")
+    parser.add_argument("--keep", action="store_true",
+                        help="Bitince müzayede ve teklif kayıtlarını silme")
+    parser.add_argument("--json", action="store_true",
+                        help="Sonuçları JSON olarak stdout'a yaz; insan okunur çıktı stderr'e gider")
+    args = parser.parse_args(argv)
+    if not args.mongo_url:
+        parser.error("--mongo-url veya MONGO_URL gerekli")
+    return args
+
+
+# ══════════════════════════════════════════════════════════════════
+# HAZIRLIK
+# ══════════════════════════════════════════════════════════════════
+
+async def create_auction(db, snipe: bool) -> str:
+    now = datetime.now(timezone.utc)
+    product_id = f"bench_{uuid.uuid4().hex[:12]}"
+    await db.products.insert_one({
+        "product_id": product_id,
+        "title": {"tr": "Benchmark müzayedesi", "en": "Benchmark auction", "it": "Asta di benchmark"},
+        "description": {"tr": "Geçici kayıt.", "en": "Temporary record.", "it": "Record temporaneo."},
+        "category": "watches",
+        "price": STARTING_BID,
+        "currency": "USD",
+        "status": "active",
+        "approval_status": "pending",  # Vitrinde görünmesin
+        "is_auction": True,
+        "seller_id": "bench_seller",
+        "starting_bid": STARTING_BID,
+        "current_bid": STARTING_BID,
+        "min_increment": MIN_INCREMENT,
+        "bid_count": 0,
+        "auction_start": now - timedelta(minutes=1),
+        "auction_end": now + (timedelta(minutes=4) if snipe else timedelta(hours=1)),
+        "created_at": now,
+        "synthetic": True,
+    })
+    return product_id
+
+
+async def cleanup(db, product_id: str) -> None:
+    await db.bids.delete_many({"product_id": product_id})
+    await db.products.delete_one({"product_id": product_id})
+
+
+# ══════════════════════════════════════════════════════════════════
+# TEKLİF AKIŞLARI
+# ══════════════════════════════════════════════════════════════════
+
+async def atomic_bid(db, product_id: str, user: dict, amount: float) -> dict:
+    try:
+        bid = await bidding.place_bid(db, product_id, user, amount)
+    except bidding.BidRejected as e:
+        return {"status": e.status_code}
+    return {"status": 200, "bid_id": bid["bid_id"], "amount": amount}
+
+
+async def legacy_bid(db, product_id: str, user: dict, amount: float) -> dict:
+    """Atomik servisten önceki akış: ürünü oku, Python'da doğrula, kaydı ekle, fiyatı yaz."""
+    product = await db.products.find_one({"product_id": product_id, "is_auction": True}, {"_id": 0})
+    _, _, minimum = bidding.minimum_next_bid(product)
+    if amount < minimum:
+        return {"status": 400}
+    bid_id = f"bid_{uuid.uuid4().hex[:12]}"
+    await db.bids.insert_one({
+        "bid_id": bid_id,
+        "product_id": product_id,
+        "user_id": user["user_id"],
+        "user_name": user["name"],
+        "amount": amount,
+        "max_auto_bid": None,
+        "created_at": datetime.now(timezone.utc),
+    })
+    await db.products.update_one(
+        {"product_id": product_id},
+        {"$set": {"current_bid": amount, "high_bidder_id": user["user_id"], "last_bid_id": bid_id},
+         "$inc": {"bid_count": 1}},
+    )
+    return {"status": 200, "bid_id": bid_id, "amount": amount}
+
+
+async def run_load(db, product_id: str, args: argparse.Namespace) -> tuple[list[dict], list[float], float]:
+    place = atomic_bid if args.mode == "atomic" else legacy_bid
+    rng = random.Random(args.seed)
+    users = [{"user_id": f"bench_user_{i}", "name": f"Bench {i}"} for i in range(args.bidders)]
+    # Teklif verenlerin gördüğü son fiyat; gerçek istemciler gibi biraz bayat olabilir
+    seen = {"current": STARTING_BID}
+    gate = asyncio.Semaphore(args.concurrency)
+    results: list[dict] = []
+    latencies: list[float] = []
+
+    async def one(i: int) -> None:
+        user = users[i % len(users)]
+        async with gate:
+            amount = round(seen["current"] + MIN_INCREMENT * rng.randint(1, 3), 2)
+            started = time.perf_counter()
+            result = await place(db, product_id, user, amount)
+            latencies.append((time.perf_counter() - started) * 1000)
+        if result["status"] == 200:
+            seen["current"] = max(seen["current"], amount)
+        else:
+            # Reddedilen istemci güncel fiyatı tekrar okur
+            product = await db.products.find_one({"product_id": product_id}, {"_id": 0, "current_bid": 1})
+            seen["current"] = max(seen["current"], float(product.get("current_bid") or 0))
+        results.append({**result, "user_id": user["user_id"]})
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.bids)))
+    return results, latencies, time.perf_counter() - started
+
+
+# ══════════════════════════════════════════════════════════════════
+# DOĞRULAMA + RAPOR
+# ══════════════════════════════════════════════════════════════════
+
+def _percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 2)
+
+
+async def verify(db, product_id: str, results: list[dict]) -> dict:
+    product = await db.products.find_one({"product_id": product_id}, {"_id": 0})
+    # Onaylanmış kayıtlar; kaybeden teklifler kendi bekleyen kayıtlarını silmiş olmalı
+    bids = await db.bids.find(
+        {"product_id": product_id, "pending": {"$exists": False}}, {"_id": 0, "bid_id": 1, "amount": 1}
+    ).to_list(None)
+    pending = await db.bids.count_documents({"product_id": product_id, "pending": {"$exists": True}})
+    accepted = [r for r in results if r["status"] == 200]
+    current = float(product.get("current_bid") or 0)
+    max_accepted = max((r["amount"] for r in accepted), default=STARTING_BID)
+    max_recorded = max((b["amount"] for b in bids), default=STARTING_BID)
+    top = max(bids, key=lambda b: b["amount"], default=None)
+
+    violations = []
+    if not (current == max_accepted == max_recorded):
+        violations.append(f"current_bid={current} max_kabul={max_accepted} max_kayıt={max_recorded}")
+    if product.get("bid_count", 0) != len(bids):
+        violations.append(f"bid_count={product.get('bid_count', 0)} kayıt={len(bids)}")
+    if len(accepted) != len(bids):
+        violations.append(f"kabul={len(accepted)} kayıt={len(bids)}")
+    overwritten = sum(1 for r in accepted if r["amount"] > current)
+    if overwritten:
+        violations.append(f"{overwritten} yüksek teklifin üzerine düşük teklif yazıldı")
+    if pending:
+        violations.append(f"{pending} bekleyen (pending) teklif kaydı kaldı")
+    if top and product.get("last_bid_id") != top["bid_id"]:
+        violations.append(f"last_bid_id={product.get('last_bid_id')} en_yüksek={top['bid_id']}")
+
+    return {
+        "current_bid": current,
+        "bid_count": product.get("bid_count", 0),
+        "bid_records": len(bids),
+        "auction_end": product.get("auction_end"),
+        "violations": violations,
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"\n{'═'*60}\n  ✦ Teklif benchmark'ı → {report['database']} ({report['mode']})\n{'═'*60}")
+    print(f"  Gönderilen          : {report['bids']:,} teklif, {report['concurrency']} eşzamanlı")
+    print("  Sonuçlar            : " + ", ".join(f"{k}={v:,}" for k, v in sorted(report["statuses"].items())))
+    print(f"  Süre                : {report['seconds']:.2f} sn")
+    print(f"  Kabul / saniye      : {report['accepted_per_sec']:,.1f}")
+    print(f"  Gecikme p50 / p99   : {report['p50_ms']} ms / {report['p99_ms']} ms")
+    c = report["consistency"]
+    print(f"  Son durum           : current_bid={c['current_bid']:,.2f} bid_count={c['bid_count']:,} "
+          f"kayıt={c['bid_records']:,}")
+    if c["violations"]:
+        for v in c["violations"]:
+            print(f"  ❌ {v}")
+    else:
+        print("  ✅ Tutarlılık ihlali yok.")
+
+
+async def run(args: argparse.Namespace) -> dict:
+    client = AsyncIOMotorClient(args.mongo_url, serverSelectionTimeoutMS=8000, maxPoolSize=args.concurrency)
+    try:
+        await client.admin.command("ping")
+        db = client[args.db_name]
+        product_id = await create_auction(db, args.snipe)
+        print(f"  ✅ Müzayede oluşturuldu: {product_id}")
+        try:
+            results, latencies, seconds = await run_load(db, product_id, args)
+            consistency = await verify(db, product_id, results)
+        finally:
+            if not args.keep:
+                await cleanup(db, product_id)
+                print("  🧹 Müzayede ve teklif kayıtları silindi.")
+    finally:
+        client.close()
+
+    statuses = Counter(str(r["status"]) for r in results)
+    return {
+        "database": args.db_name,
+        "mode": args.mode,
+        "product_id": product_id,
+        "bids": args.bids,
+        "concurrency": args.concurrency,
+        "statuses": dict(statuses),
+        "seconds": round(seconds, 3),
+        "accepted_per_sec": round(statuses.get("200", 0) / seconds, 1) if seconds else 0.0,
+        "p50_ms": _percentile(latencies, 0.50),
+        "p99_ms": _percentile(latencies, 0.99),
+        "consistency": consistency,
+    }
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    # JSON modunda stdout yalnızca rapor taşır
+    human = sys.stderr if args.json else sys.stdout
+    with redirect_stdout(human):
+        try:
+            report = asyncio.run(run(args))
+        except ConnectionFailure as e:
+            print(f"  ❌ Bağlantı hatası: {e}")
+            return 2
+        print_report(report)
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False, default=str)
+        sys.stdout.write("\n")
+    return 1 if report["consistency"]["violations"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,339 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║          ANTICCA — Sorgu Şekli / Index Danışmanı                 ║
+║                                                                  ║
+║  API'nin ürettiği her sorgu + sıralama şeklini hedef             ║
+║  veritabanında explain("executionStats") ile çalıştırır ve       ║
+║  şunları işaretler:                                              ║
+║    • COLLSCAN (tam koleksiyon taraması)                          ║
+║    • Bellekte SORT (index sıralamayı karşılamıyor)               ║
+║    • Yüksek incelenen / dönen doküman oranı                      ║
+║  Sorunlu şekiller için ESR (Eşitlik → Sıralama → Aralık)         ║
+║  sırasına göre bileşik index önerir.                             ║
+║                                                                  ║
+║  Kullanım (backend kökünde, app/ yanında):                       ║
+║    python anticca_index_advisor.py                               ║
+║                                                                  ║
+║  Canlı trafikten (profiler açıkken, db.setProfilingLevel(1)):    ║
+║    python anticca_index_advisor.py --from-profile                ║
+║                                                                  ║
+║  CI (yerel mongod + sentetik veri):                              ║
+║    python anticca_db_setup.py --non-interactive                  ║
+║    python anticca_db_setup.py --generate --gen-products 200000   ║
+║    python anticca_index_advisor.py --strict --json > advice.json ║
+╚══════════════════════════════════════════════════════════════════╝
+"""
+
+import os
+import sys
+import json
+import argparse
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from pymongo import MongoClient
+from pymongo.errors import ConnectionFailure, OperationFailure
+
+# Backend kökünden (app/ klasörünün yanında) çalıştırılmalı
+from app.core.db_schema import INDEXES
+from app.core.query_shapes import NOW, Sample, QueryShape, query_shapes
+
+DEFAULT_DB_NAME = "anticca"
+
+# Aralık / eşitlik dışı operatörler — ESR'de en sona gider
+RANGE_OPERATORS = {"$gt", "$gte", "$lt", "$lte", "$ne", "$nin", "$in", "$regex", "$exists"}
+
+
+# ══════════════════════════════════════════════════════════════════
+# AYARLAR
+# ══════════════════════════════════════════════════════════════════
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="ANTICCA sorgu şekli / index danışmanı (explain executionStats)",
+    )
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL"),
+                        help="MongoDB bağlantı URL'i (env: MONGO_URL)")
+    parser.add_argument("--db-name", default=os.environ.get("DB_NAME", DEFAULT_DB_NAME),
+                        help=f"Veritabanı adı (env: DB_NAME, varsayılan: {DEFAULT_DB_NAME})")
+    parser.add_argument("--from-profile", action="store_true",
+                        help="Şekilleri katalog yerine system.profile'dan (canlı trafik) topla")
+    parser.add_argument("--profile-limit", type=int, default=5000,
+                        help="--from-profile ile okunacak en fazla profil kaydı (varsayılan: 5000)")
+    parser.add_argument("--ratio", type=float, default=10.0,
+                        help="İncelenen/dönen doküman oranı eşiği (varsayılan: 10)")
+    parser.add_argument("--min-examined", type=int, default=100,
+                        help="Oran uyarısı için en az incelenen doküman (varsayılan: 100)")
+    parser.add_argument("--strict", action="store_true",
+                        help="Herhangi bir bulgu varsa 1 ile çık (CI)")
+    parser.add_argument("--json", action="store_true",
+                        help="Sonuçları JSON olarak stdout'a yaz; insan okunur çıktı stderr'e gider")
+    args = parser.parse_args(argv)
+    if not args.mongo_url:
+        parser.error("--mongo-url veya MONGO_URL gerekli")
+    return args
+
+
+# ══════════════════════════════════════════════════════════════════
+# ŞEKİLLER — katalog veya profiler
+# ══════════════════════════════════════════════════════════════════
+
+def _skeleton(value):
+    """Değerleri tip adlarıyla değiştirir; aynı şekle sahip sorgular tek kayda iner."""
+    if isinstance(value, dict):
+        return {k: _skeleton(v) for k, v in sorted(value.items())}
+    if isinstance(value, list):
+        return [_skeleton(v) for v in value[:1]]
+    return type(value).__name__
+
+
+def shapes_from_profile(db, limit: int) -> list[QueryShape]:
+    entries = (
+        db["system.profile"]
+        .find({"ns": {"$regex": f"^{db.name}\\."}, "command.find": {"$exists": True}})
+        .sort("ts", -1)
+        .limit(limit)
+    )
+    seen: dict[str, QueryShape] = {}
+    for entry in entries:
+        cmd = entry["command"]
+        col = cmd["find"]
+        if col.startswith("system."):
+            continue
+        flt = cmd.get("filter", {})
+        sort = list(cmd.get("sort", {}).items())
+        key = json.dumps([col, _skeleton(flt), sort], sort_keys=True)
+        if key not in seen:
+            # İlk (en yeni) kaydın gerçek değerleri explain için kullanılır
+            seen[key] = QueryShape(
+                f"profile:{col} {json.dumps(_skeleton(flt), ensure_ascii=False)} sort={sort}",
+                col, flt, sort, int(cmd.get("limit", 0)), "system.profile",
+            )
+    return list(seen.values())
+
+
+class SampleResolver:
+    """Sample yer tutucularını mevcut dokümanlardan gerçek değerlere çevirir."""
+
+    _MISSING = object()
+
+    def __init__(self, db):
+        self.db = db
+        self.cache: dict[tuple[str, str], object] = {}
+        self.now = datetime.now(timezone.utc)
+
+    def value(self, sample: Sample):
+        key = (sample.collection, sample.field)
+        if key not in self.cache:
+            doc = self.db[sample.collection].find_one(
+                {sample.field: {"$exists": True, "$ne": None}}, {sample.field: 1},
+            )
+            self.cache[key] = doc[sample.field] if doc else self._MISSING
+        return self.cache[key]
+
+    def bind(self, value):
+        if value is NOW:
+            return self.now
+        if isinstance(value, Sample):
+            resolved = self.value(value)
+            if resolved is self._MISSING:
+                raise LookupError(f"{value.collection}.{value.field} için örnek veri yok")
+            return resolved
+        if isinstance(value, dict):
+            return {k: self.bind(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.bind(v) for v in value]
+        return value
+
+
+# ══════════════════════════════════════════════════════════════════
+# EXPLAIN ANALİZİ
+# ══════════════════════════════════════════════════════════════════
+
+def explain(db, shape: QueryShape, flt: dict) -> dict:
+    cmd = {"find": shape.collection, "filter": flt}
+    if shape.sort:
+        cmd["sort"] = dict(shape.sort)
+    if shape.limit:
+        cmd["limit"] = shape.limit
+    return db.command("explain", cmd, verbosity="executionStats")
+
+
+def _walk(stage: dict):
+    yield stage
+    if "inputStage" in stage:
+        yield from _walk(stage["inputStage"])
+    for child in stage.get("inputStages", []):
+        yield from _walk(child)
+
+
+def analyse(result: dict, shape: QueryShape, ratio: float, min_examined: int) -> dict:
+    stats = result["executionStats"]
+    # SBE motorunda (7.0+) klasik aşama adları winningPlan.queryPlan altındadır
+    winning = result["queryPlanner"]["winningPlan"]
+    stages = list(_walk(winning.get("queryPlan", winning)))
+    names = [s["stage"] for s in stages]
+    indexes = sorted({s["indexName"] for s in stages if s.get("indexName")})
+    returned = stats["nReturned"]
+    docs = stats["totalDocsExamined"]
+    keys = stats["totalKeysExamined"]
+
+    findings = []
+    if "COLLSCAN" in names and not shape.allow_collscan:
+        findings.append("COLLSCAN")
+    if "SORT" in names:
+        findings.append("in-memory SORT")
+    examined = max(docs, keys)
+    if examined >= min_examined and examined / max(returned, 1) > ratio:
+        findings.append(f"examined/returned {examined / max(returned, 1):.0f}x")
+
+    return {
+        "plan": " → ".join(dict.fromkeys(reversed(names))),
+        "indexes": indexes,
+        "returned": returned,
+        "keys_examined": keys,
+        "docs_examined": docs,
+        "millis": stats["executionTimeMillis"],
+        "findings": findings,
+    }
+
+
+# ══════════════════════════════════════════════════════════════════
+# ÖNERİ — ESR kuralı
+# ══════════════════════════════════════════════════════════════════
+
+def suggest_index(shape: QueryShape) -> list[tuple[str, int]] | None:
+    """Eşitlik alanları → sıralama alanları → aralık alanları. $or/$text için öneri yok."""
+    if any(k.startswith("$") for k in shape.filter):
+        return None
+    equality, ranges = [], []
+    for field, cond in shape.filter.items():
+        if isinstance(cond, dict) and any(op in RANGE_OPERATORS for op in cond):
+            ranges.append(field)
+        else:
+            equality.append(field)
+
+    keys: list[tuple[str, int]] = []
+    for field, direction in [(f, 1) for f in equality] + list(shape.sort) + [(f, 1) for f in ranges]:
+        if field not in (k for k, _ in keys):
+            keys.append((field, direction))
+    return keys or None
+
+
+def declared_covering(collection: str, keys: list[tuple[str, int]]) -> str | None:
+    """Önerinin ön eki olduğu (ya da tam ters yönlüsü) tanımlı index adı."""
+    inverted = [(f, -d) for f, d in keys]
+    for spec, opts in INDEXES.get(collection, []):
+        prefix = [(f, d) for f, d in spec[:len(keys)]]
+        if prefix in (keys, inverted):
+            return opts["name"]
+    return None
+
+
+def index_name(collection: str, keys: list[tuple[str, int]]) -> str:
+    parts = [f.replace(".", "_") + ("" if d == 1 else "_desc") for f, d in keys]
+    return f"idx_{collection}_" + "_".join(parts)
+
+
+# ══════════════════════════════════════════════════════════════════
+# ÇALIŞTIRMA
+# ══════════════════════════════════════════════════════════════════
+
+def run(db, shapes: list[QueryShape], ratio: float, min_examined: int) -> dict:
+    resolver = SampleResolver(db)
+    existing = {col: {i["name"] for i in db[col].list_indexes()} for col in {s.collection for s in shapes}}
+    results, suggestions = [], {}
+
+    for shape in shapes:
+        entry = {"name": shape.name, "collection": shape.collection, "source": shape.source}
+        try:
+            flt = resolver.bind(shape.filter)
+            entry.update(analyse(explain(db, shape, flt), shape, ratio, min_examined))
+        except LookupError as e:
+            entry.update({"skipped": str(e), "findings": []})
+        except OperationFailure as e:
+            entry.update({"error": str(e), "findings": [f"explain hata: {e.code}"]})
+        results.append(entry)
+
+        if not entry["findings"]:
+            continue
+        keys = suggest_index(shape)
+        if not keys:
+            continue
+        declared = declared_covering(shape.collection, keys)
+        name = declared or index_name(shape.collection, keys)
+        suggestion = suggestions.setdefault(name, {
+            "collection": shape.collection,
+            "name": name,
+            "keys": keys,
+            # Tanımlı ama veritabanında yoksa çözüm kurulum scriptini çalıştırmaktır
+            "status": ("declared, missing in database — run anticca_db_setup.py"
+                       if declared and name not in existing.get(shape.collection, set())
+                       else "declared, not chosen by planner" if declared else "new"),
+            "shapes": [],
+        })
+        suggestion["shapes"].append(shape.name)
+        entry["suggestion"] = name
+
+    return {
+        "database": db.name,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "shapes": results,
+        "suggestions": list(suggestions.values()),
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"\n{'═'*60}\n  ✦ Sorgu şekilleri → {report['database']}\n{'═'*60}")
+    for r in report["shapes"]:
+        if "skipped" in r:
+            print(f"  ⏭️  {r['name']:<44} {r['skipped']}")
+            continue
+        if "error" in r:
+            print(f"  ❌ {r['name']:<44} {r['error']}")
+            continue
+        icon = "⚠️ " if r["findings"] else "✅"
+        print(f"  {icon} {r['name']:<44} {r['plan']}")
+        print(f"       keys={r['keys_examined']:,} docs={r['docs_examined']:,} "
+              f"returned={r['returned']:,} {r['millis']}ms  idx={','.join(r['indexes']) or '—'}")
+        if r["findings"]:
+            print(f"       → {'; '.join(r['findings'])}")
+
+    if not report["suggestions"]:
+        print("\n  ✅ Tüm şekiller index ile karşılanıyor.")
+        return
+    print(f"\n{'═'*60}\n  ✦ Index önerileri (app/core/db_schema.py → INDEXES)\n{'═'*60}")
+    for s in report["suggestions"]:
+        keys = ", ".join(f'("{f}", {"ASCENDING" if d == 1 else "DESCENDING"})' for f, d in s["keys"])
+        print(f"  # {s['collection']} — {s['status']} — {len(s['shapes'])} şekil")
+        print(f'  ([{keys}], {{"name": "{s["name"]}"}}),')
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    # JSON modunda stdout yalnızca rapor taşır
+    human = sys.stderr if args.json else sys.stdout
+    with redirect_stdout(human):
+        try:
+            client = MongoClient(args.mongo_url, serverSelectionTimeoutMS=8000)
+            client.admin.command("ping")
+        except ConnectionFailure as e:
+            print(f"  ❌ Bağlantı hatası: {e}")
+            return 2
+        db = client[args.db_name]
+        try:
+            shapes = shapes_from_profile(db, args.profile_limit) if args.from_profile else query_shapes()
+            report = run(db, shapes, args.ratio, args.min_examined)
+            print_report(report)
+        finally:
+            client.close()
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False, default=str)
+        sys.stdout.write("\n")
+    flagged = sum(1 for r in report["shapes"] if r["findings"])
+    print(f"\n  {flagged} / {len(report['shapes'])} şekil işaretlendi.", file=human)
+    return 1 if args.strict and flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())